@@ -14,11 +14,14 @@ Desarrollado por: Ing. José Miguel Santos
 Para: Secretaría de Salud del Tolima
 """
 
+import argparse
+import hashlib
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import sys
 import os
+import re
+import traceback
 import warnings
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
@@ -32,6 +35,7 @@ from reportlab.platypus import (
     Table,
     TableStyle,
     KeepTogether,
+    LongTable,
 )
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT, TA_JUSTIFY
 from reportlab.pdfgen import canvas
@@ -42,8 +46,24 @@ from reportlab.platypus.frames import Frame
 try:
     from dateutil import parser
 except ImportError:
+    parser = None
     print("⚠️ dateutil no disponible, usando datetime básico")
 
+# Lectura rápida del Excel (opcional): Polars + calamine, con pyarrow para
+# la conversión a pandas. Si no están instalados se usa pd.read_excel.
+try:
+    import polars as pl
+    import pyarrow  # noqa: F401 - requerido por DataFrame.to_pandas()
+except ImportError:
+    pl = None
+
+# Caché de lectura en Feather (solo datos: cargarla no ejecuta código). Sin
+# pyarrow no se usa caché y el Excel se lee en cada ejecución.
+try:
+    from pyarrow import feather
+except ImportError:
+    feather = None
+
 warnings.filterwarnings("ignore")
 
 # Configuración global
@@ -59,6 +79,9 @@ COLORS = {
     "subgrupo_bg": "#E8F4FD",  # Azul claro para filas de subgrupos
 }
 
+# Los mismos colores ya convertidos a objetos de ReportLab (el hex se interpreta una vez)
+COLORES_RL = {nombre: colors.HexColor(valor) for nombre, valor in COLORS.items()}
+
 # Umbrales de ocupación
 UMBRALES = {
     "critico": 90,  # ≥90% crítico
@@ -66,6 +89,221 @@ UMBRALES = {
     "normal": 0,  # <70% normal
 }
 
+# Columnas del Excel que usa el informe (las demás no se leen)
+COLUMNAS_REQUERIDAS = [
+    "municipio_sede_prestador",
+    "nombre_prestador",
+    "nombre_sede_prestador",
+    "nombre_capacidad_instalada",
+    "cantidad_ci_TOTAL_REPS",
+    "ocupacion_ci_no_covid19",
+]
+COLUMNAS_UTILIZADAS = frozenset(COLUMNAS_REQUERIDAS + ["fecha_registro"])
+
+# Explicación de umbrales de la portada (depende solo de UMBRALES, se arma una vez)
+TEXTO_UMBRALES = "".join(
+    f"• {linea}<br/>"
+    for linea in [
+        f"<b>NORMAL:</b> Menos del {UMBRALES['advertencia']}% de ocupación",
+        f"<b>ADVERTENCIA:</b> Entre {UMBRALES['advertencia']}% y {UMBRALES['critico']-1}% de ocupación",
+        f"<b>CRÍTICO:</b> {UMBRALES['critico']}% o más de ocupación",
+    ]
+)
+
+# Carpeta de caché del Excel leído (se invalida al cambiar fecha o tamaño del archivo).
+# Es una subcarpeta propia del informe: la limpieza de cachés viejas no toca otros archivos.
+CARPETA_CACHE = os.path.join(".cache", "hospital_report")
+# Versión del contenido de la caché: subirla si cambia cómo se lee o guarda el Excel
+VERSION_CACHE = 1
+
+# Anchos fijos para las tablas IPS por municipio (Ibagué y otros municipios):
+# evitan que ReportLab calcule el ancho de cada columna recorriendo todas las celdas.
+# Toman el ancho automático medido (encabezados en negrita + padding) con un pequeño margen.
+ANCHOS_TABLA_IPS = [
+    3.1 * inch,  # IPS / Tipo de Servicio
+    0.76 * inch,  # Capacidad Instalada
+    0.76 * inch,  # Ocupación Actual
+    0.76 * inch,  # Disponible
+    0.9 * inch,  # % Ocupación
+    0.9 * inch,  # Estado
+]
+
+# Patrón del Hospital Federico Lleras Acosta en nombre_prestador (compilado una vez)
+PATRON_FEDERICO = re.compile(r"FEDERICO\s+LLERAS\s+ACOSTA", re.IGNORECASE)
+
+# Prefijo del tipo de capacidad que no se muestra en las tablas (CAMAS-/CAMILLAS-)
+PATRON_PREFIJO_CAPACIDAD = re.compile("CAMAS-|CAMILLAS-")
+
+# Prefijo de las filas de detalle en las tablas IPS según el tipo de fila
+# (sin emoji: Helvetica no tiene esos glifos)
+PREFIJOS_FILA_IPS = {"subgrupo": "   ", "categoria": "   • "}
+
+# Hoja de estilos de ReportLab creada una sola vez para todo el informe
+ESTILOS = getSampleStyleSheet()
+
+# Comandos comunes a todas las tablas de datos (sólo cambian encabezado y tamaños)
+COMANDOS_TABLA_BASE = (
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
+    ("GRID", (0, 0), (-1, -1), 1, colors.black),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ("ALIGN", (0, 1), (0, -1), "LEFT"),  # Nombres alineados a la izquierda
+)
+
+# Colores de filas y estados en las tablas, creados una sola vez (no por fila)
+FONDOS_TIPO_FILA = {
+    "subgrupo": COLORES_RL["subgrupo_bg"],
+    "total": colors.HexColor("#E3F2FD"),
+}
+COLORES_ESTADO = {  # estado: (fondo, texto)
+    "CRÍTICO": (colors.HexColor("#FFCDD2"), colors.HexColor("#B71C1C")),
+    "ADVERTENCIA": (colors.HexColor("#FFF3E0"), colors.HexColor("#E65100")),
+    "NORMAL": (colors.HexColor("#E8F5E8"), colors.HexColor("#2E7D32")),
+}
+
+# Estilo fijo de la tabla de firmas (no recibe comandos por fila, se comparte)
+ESTILO_TABLA_FIRMAS = TableStyle(
+    [
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ("TOPPADDING", (0, 0), (-1, -1), 20),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+    ]
+)
+
+# Estilos de párrafo del informe, definidos una sola vez
+ESTILO_TITULO_PRINCIPAL = ParagraphStyle(
+    "TituloPrincipal",
+    parent=ESTILOS["Title"],
+    fontSize=16,
+    spaceAfter=20,
+    textColor=COLORES_RL["primary"],
+    alignment=TA_CENTER,
+    fontName="Helvetica-Bold",
+)
+
+ESTILO_TITULO_SECCION = ParagraphStyle(
+    "TituloSeccion",
+    parent=ESTILOS["Heading1"],
+    fontSize=12,
+    spaceAfter=12,
+    spaceBefore=6,
+    textColor=COLORES_RL["primary"],
+    fontName="Helvetica-Bold",
+)
+
+ESTILO_TEXTO_NORMAL = ParagraphStyle(
+    "TextoNormal",
+    parent=ESTILOS["Normal"],
+    fontSize=9,
+    spaceAfter=8,
+    spaceBefore=4,
+    alignment=TA_JUSTIFY,
+)
+
+ESTILO_TEXTO_SMALL = ParagraphStyle(
+    "TextoSmall",
+    parent=ESTILOS["Normal"],
+    fontSize=8,
+    spaceAfter=6,
+    spaceBefore=3,
+    alignment=TA_JUSTIFY,
+)
+
+ESTILO_FIRMA = ParagraphStyle(
+    "EstiloFirma",
+    parent=ESTILOS["Normal"],
+    fontSize=9,
+    spaceAfter=4,
+    spaceBefore=2,
+    alignment=TA_LEFT,
+    fontName="Helvetica",
+)
+
+ESTILO_FIRMA_CENTER = ParagraphStyle(
+    "EstiloFirmaCenter",
+    parent=ESTILOS["Normal"],
+    fontSize=9,
+    spaceAfter=4,
+    spaceBefore=2,
+    alignment=TA_CENTER,
+    fontName="Helvetica",
+)
+
+
+def calcular_porcentaje_ocupacion(ocupacion, capacidad, dtype=np.float64):
+    """Porcentaje de ocupación vectorizado (0 donde no hay capacidad)."""
+    capacidad = np.asarray(capacidad)
+    ocupacion = np.asarray(ocupacion)
+
+    # Una sola división sobre un buffer en ceros (ya en el dtype final),
+    # sin dividir donde capacidad = 0
+    porcentaje = np.zeros(capacidad.shape, dtype=dtype)
+    np.divide(ocupacion, capacidad, out=porcentaje, where=capacidad > 0)
+    porcentaje *= 100
+    return porcentaje
+
+
+def sumar_capacidad_ocupacion(df):
+    """Capacidad y ocupación totales de un DataFrame en una sola reducción."""
+    capacidad, ocupacion = (
+        df[["cantidad_ci_TOTAL_REPS", "ocupacion_actual"]].sum().tolist()
+    )
+    return int(capacidad), int(ocupacion)
+
+
+def contar_unicos(serie):
+    """Cantidad de valores distintos de una columna categórica, contando sus códigos."""
+    codigos = serie.cat.codes.to_numpy()
+    return int(np.count_nonzero(
+        np.bincount(codigos[codigos >= 0], minlength=len(serie.cat.categories))
+    ))
+
+
+def clasificar_estado(porcentaje):
+    """Estado (CRÍTICO / ADVERTENCIA / NORMAL) vectorizado según UMBRALES."""
+    porcentaje = np.asarray(porcentaje, dtype=np.float64)
+    return np.select(
+        [porcentaje >= UMBRALES["critico"], porcentaje >= UMBRALES["advertencia"]],
+        ["CRÍTICO", "ADVERTENCIA"],
+        default="NORMAL",
+    )
+
+
+def crear_estilo_tabla(color_encabezado, fuente_encabezado=8, fuente_cuerpo=7, padding_encabezado=8):
+    """TableStyle nuevo (se le agregan colores por fila) sobre los comandos base."""
+    return TableStyle(
+        [
+            ("BACKGROUND", (0, 0), (-1, 0), color_encabezado),
+            ("FONTSIZE", (0, 0), (-1, 0), fuente_encabezado),
+            ("FONTSIZE", (0, 1), (-1, -1), fuente_cuerpo),
+            ("BOTTOMPADDING", (0, 0), (-1, 0), padding_encabezado),
+            *COMANDOS_TABLA_BASE,
+        ]
+    )
+
+
+def normalizar_por_unicos(serie, normalizar):
+    """Limpiar el texto sobre las categorías de la columna y devolverla categórica (ordenada)."""
+    categorias = serie.astype("category")
+    mapa = {
+        valor: normalizar(valor) if isinstance(valor, str) else np.nan
+        for valor in categorias.cat.categories
+    }
+    # Los registros solo reciben el código de su categoría ya limpia
+    normalizada = categorias.map(mapa).astype("category")
+    return normalizada.cat.reorder_categories(sorted(normalizada.cat.categories))
+
+
+def formatear_celdas(capacidad, ocupacion, disponible, porcentaje):
+    """Celdas numéricas de una fila: enteros con separador de miles y porcentaje."""
+    return [f"{capacidad:,}", f"{ocupacion:,}", f"{disponible:,}", f"{porcentaje}%"]
+
+
 # CONFIGURACIÓN DE CATEGORIZACIÓN Y SUBGRUPOS
 def definir_configuracion_categorias():
     """Definir configuración completa de categorías y subgrupos."""
@@ -115,10 +353,23 @@ class HospitalDocTemplate(BaseDocTemplate):
         # Fecha del registro (desde Excel) o actual como fallback
         self.fecha_registro = fecha_registro or datetime.now()
 
+        # Texto de la fecha formateado una sola vez (se dibuja en cada página)
+        if isinstance(self.fecha_registro, str):
+            self.fecha_registro_str = self.fecha_registro
+        else:
+            self.fecha_registro_str = self.fecha_registro.strftime("%d/%m/%Y %H:%M")
+
         # Header height definido como constante de clase
         self.header_height = 95  # Aumentado para evitar superposición (puntos)
         self.header_height_inches = self.header_height / 72.0  # Conversión a inches
 
+        # Logo fijo - Gobernacion.png, resuelto una sola vez por documento.
+        # drawImage lo recibe por ruta y ReportLab lo embebe una única vez.
+        self.logo_path = "Gobernacion.png"
+        self.logo_disponible = os.path.exists(self.logo_path)
+        if not self.logo_disponible:
+            print(f"⚠️ Logo no encontrado: {self.logo_path}")
+
         # Frame con márgenes consistentes
         frame = Frame(
             0.4 * inch,  # Left margin
@@ -148,19 +399,18 @@ class HospitalDocTemplate(BaseDocTemplate):
         header_height = self.header_height
 
         # Fondo del encabezado con posición fija
-        canvas.setFillColor(colors.HexColor(COLORS["header_bg"]))
+        canvas.setFillColor(COLORES_RL["header_bg"])
         canvas.rect(0, page_height - header_height, page_width, header_height, fill=1)
 
         # Logo fijo - Gobernacion.png
-        logo_path = "Gobernacion.png"
-        if os.path.exists(logo_path):
+        if self.logo_disponible:
             try:
                 logo_x = 15
                 logo_y = page_height - header_height + 15
                 logo_size = 65
 
                 canvas.drawImage(
-                    logo_path,
+                    self.logo_path,
                     logo_x,
                     logo_y,
                     width=logo_size,
@@ -169,8 +419,7 @@ class HospitalDocTemplate(BaseDocTemplate):
                 )
             except Exception as e:
                 print(f"⚠️ Error cargando logo Gobernacion.png: {e}")
-        else:
-            print(f"⚠️ Logo no encontrado: {logo_path}")
+                self.logo_disponible = False
 
         # Posiciones Y fijas calculadas desde la parte superior
         canvas.setFillColor(colors.whitesmoke)
@@ -200,21 +449,18 @@ class HospitalDocTemplate(BaseDocTemplate):
         # Información lateral con fecha de registro del Excel
         canvas.setFont("Helvetica", 8)
 
-        # Fecha del registro (desde Excel)
-        if isinstance(self.fecha_registro, str):
-            fecha_str = self.fecha_registro
-        else:
-            fecha_str = self.fecha_registro.strftime("%d/%m/%Y %H:%M")
-
+        # Fecha del registro (desde Excel), ya formateada en __init__
         y_fecha = page_height - 30
-        canvas.drawRightString(page_width - 15, y_fecha, f"Fecha registro: {fecha_str}")
+        canvas.drawRightString(
+            page_width - 15, y_fecha, f"Fecha registro: {self.fecha_registro_str}"
+        )
 
         # Número de página
         y_pagina = page_height - 42
         canvas.drawRightString(page_width - 15, y_pagina, f"Página {doc.page}")
 
         # Línea separadora en la parte inferior del encabezado
-        canvas.setStrokeColor(colors.HexColor(COLORS["secondary"]))
+        canvas.setStrokeColor(COLORES_RL["secondary"])
         canvas.setLineWidth(2)
         canvas.line(
             0,
@@ -232,29 +478,38 @@ class HospitalCompletoGenerator:
     def __init__(self):
         self.df = None
         self.fecha_procesamiento = datetime.now()
+        # Marca de tiempo del nombre de archivo, formateada una sola vez
+        self.timestamp_archivo = self.fecha_procesamiento.strftime("%Y%m%d_%H%M%S")
         self.todas_categorias = []
+        self.nombres_mostrar = {}
+        self.nombres_ips_cortos = {}
+        self.df_agregado = None
+        self.totales_departamento = {}
         self.mapeo_nombres, self.correccion_errores, self.subgrupos = definir_configuracion_categorias()
 
+        # Mapeo inverso categoría -> subgrupo, derivado una sola vez de la configuración
+        self.categoria_a_subgrupo = {
+            categoria: subgrupo
+            for subgrupo, categorias in self.subgrupos.items()
+            for categoria in categorias
+        }
+
+        # Título de la fila de total de cada subgrupo (invariante, se arma una vez)
+        self.titulos_total_subgrupo = {
+            subgrupo: f"TOTAL {subgrupo}" for subgrupo in self.subgrupos
+        }
+
     def cargar_datos(self, archivo_excel):
         """Cargar los datos del Excel con correcciones y validación."""
         try:
             print(f"📂 Cargando los datos hospitalarios: {archivo_excel}")
 
-            self.df = pd.read_excel(archivo_excel)
+            self.df = self._leer_excel(archivo_excel)
             print(f"📊 Datos cargados: {len(self.df)} registros")
 
             # Verificar columnas corregidas
-            columnas_requeridas = [
-                "municipio_sede_prestador",
-                "nombre_prestador",
-                "nombre_sede_prestador",
-                "nombre_capacidad_instalada",
-                "cantidad_ci_TOTAL_REPS",
-                "ocupacion_ci_no_covid19",
-            ]
-
             columnas_faltantes = [
-                col for col in columnas_requeridas if col not in self.df.columns
+                col for col in COLUMNAS_REQUERIDAS if col not in self.df.columns
             ]
             if columnas_faltantes:
                 print(f"❌ Error: Columnas faltantes: {columnas_faltantes}")
@@ -268,6 +523,71 @@ class HospitalCompletoGenerator:
             print(f"❌ Error al cargar datos: {str(e)}")
             return False
 
+    def _ruta_cache(self, archivo_excel):
+        """Ruta de caché según ruta absoluta, fecha, tamaño, columnas leídas y versión."""
+        ruta = os.path.abspath(archivo_excel)
+        info = os.stat(ruta)
+        nombre = os.path.splitext(os.path.basename(ruta))[0]
+        # Prefijo por ruta absoluta: dos Excel con el mismo nombre no comparten caché
+        prefijo_ruta = hashlib.sha256(ruta.encode("utf-8")).hexdigest()[:12]
+        # Si cambia el archivo, las columnas leídas o la versión, la caché no se reutiliza
+        contenido = hashlib.sha256(
+            repr(
+                (VERSION_CACHE, sorted(COLUMNAS_UTILIZADAS), info.st_mtime_ns, info.st_size)
+            ).encode("utf-8")
+        ).hexdigest()[:16]
+        return os.path.join(CARPETA_CACHE, f"{nombre}_{prefijo_ruta}_{contenido}.feather")
+
+    def _leer_excel(self, archivo_excel):
+        """Leer el Excel, reutilizando la copia en caché si el archivo no cambió."""
+        if feather is None:
+            return self._leer_excel_sin_cache(archivo_excel)
+
+        ruta_cache = self._ruta_cache(archivo_excel)
+
+        try:
+            df = feather.read_feather(ruta_cache)
+            print(f"⚡ Datos leídos desde caché: {ruta_cache}")
+            return df
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Caché inválida ({e}), leyendo el Excel")
+
+        df = self._leer_excel_sin_cache(archivo_excel)
+
+        try:
+            os.makedirs(CARPETA_CACHE, exist_ok=True)
+            # Eliminar cachés anteriores de este mismo archivo (mismo prefijo de ruta)
+            prefijo = os.path.basename(ruta_cache).rsplit("_", 1)[0] + "_"
+            for anterior in os.listdir(CARPETA_CACHE):
+                if anterior.startswith(prefijo) and anterior.endswith(".feather"):
+                    os.remove(os.path.join(CARPETA_CACHE, anterior))
+            feather.write_feather(df, ruta_cache)
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar la caché: {e}")
+
+        return df
+
+    def _leer_excel_sin_cache(self, archivo_excel):
+        """Leer solo las columnas utilizadas, con Polars (calamine) si está disponible."""
+        if pl is not None:
+            try:
+                return pl.read_excel(
+                    archivo_excel,
+                    engine="calamine",
+                    read_options={
+                        "use_columns": lambda columna: columna.name.strip() in COLUMNAS_UTILIZADAS
+                    },
+                ).to_pandas()
+            except Exception as e:
+                print(f"⚠️ Lectura con Polars falló ({e}), usando pandas")
+
+        # Los encabezados pueden no ser texto (p. ej. un año como 2024)
+        return pd.read_excel(
+            archivo_excel, usecols=lambda columna: str(columna).strip() in COLUMNAS_UTILIZADAS
+        )
+
     def _procesar_datos(self):
         """Procesar los datos con correcciones de nombres y errores."""
         print("🔄 Procesando datos hospitalarios con correcciones...")
@@ -284,42 +604,90 @@ class HospitalCompletoGenerator:
                 self.df.loc[mask, "nombre_capacidad_instalada"] = correccion
                 print(f"   ✅ Corregido: {error} → {correccion} ({count} registros)")
 
-        # 2. Convertir valores numéricos
-        self.df["cantidad_ci_TOTAL_REPS"] = pd.to_numeric(
-            self.df["cantidad_ci_TOTAL_REPS"], errors="coerce"
-        ).fillna(0)
-        
-        self.df["ocupacion_actual"] = pd.to_numeric(
-            self.df["ocupacion_ci_no_covid19"], errors="coerce"
-        ).fillna(0)
-
-        # 3. Calcular métricas
-        self.df["porcentaje_ocupacion"] = np.where(
-            self.df["cantidad_ci_TOTAL_REPS"] > 0,
-            (self.df["ocupacion_actual"] / self.df["cantidad_ci_TOTAL_REPS"]) * 100,
-            0,
-        )
+        # 2. Convertir valores numéricos (to_numeric solo si la columna no es numérica).
+        #    La ocupación real (no COVID) se renombra, sin dejar una copia de la columna original.
+        self.df = self.df.rename(columns={"ocupacion_ci_no_covid19": "ocupacion_actual"})
+        limite_int32 = np.iinfo(np.int32).max
+        for columna in ["cantidad_ci_TOTAL_REPS", "ocupacion_actual"]:
+            serie = self.df[columna]
+            if not pd.api.types.is_numeric_dtype(serie):
+                serie = pd.to_numeric(serie, errors="coerce")
+            serie = serie.fillna(0)
+            # Solo se reduce a int32 si no se pierde nada (enteros dentro del rango);
+            # si no, se conserva en float64 y los totales se truncan al final, como antes
+            if serie.mod(1).eq(0).all() and serie.abs().max() <= limite_int32:
+                serie = serie.astype("int32")
+            else:
+                print(f"⚠️ {columna}: valores no enteros o fuera de rango, se conserva float64")
+                serie = serie.astype("float64")
+            self.df[columna] = serie
+
+        # 3. Calcular métricas sobre los arreglos NumPy de ambas columnas
+        capacidad = self.df["cantidad_ci_TOTAL_REPS"].to_numpy()
+        ocupacion = self.df["ocupacion_actual"].to_numpy()
 
-        self.df["disponible"] = (
-            self.df["cantidad_ci_TOTAL_REPS"] - self.df["ocupacion_actual"]
+        self.df["porcentaje_ocupacion"] = calcular_porcentaje_ocupacion(
+            ocupacion, capacidad, np.float32
         )
-        self.df["disponible"] = self.df["disponible"].clip(lower=0)
 
-        # 4. Limpiar nombres
-        self.df["municipio_sede_prestador"] = (
-            self.df["municipio_sede_prestador"].str.strip().str.title()
+        # Disponible sin negativos, recortado en el mismo buffer de la resta
+        disponible = capacidad - ocupacion
+        np.maximum(disponible, 0, out=disponible)
+        self.df["disponible"] = disponible
+
+        # 4. Limpiar nombres (una vez por valor único, no por registro); quedan categóricas
+        self.df["municipio_sede_prestador"] = normalizar_por_unicos(
+            self.df["municipio_sede_prestador"], lambda valor: valor.strip().title()
         )
-        self.df["nombre_prestador"] = self.df["nombre_prestador"].str.strip()
-        self.df["nombre_capacidad_instalada"] = self.df[
-            "nombre_capacidad_instalada"
-        ].str.strip()
+        for columna in ["nombre_prestador", "nombre_capacidad_instalada"]:
+            self.df[columna] = normalizar_por_unicos(self.df[columna], str.strip)
 
         # 5. Obtener categorías (después de correcciones)
         self.todas_categorias = sorted(self.df["nombre_capacidad_instalada"].unique())
 
+        # Nombre a mostrar por categoría (cambio de nombre + sin prefijo), una sola vez
+        self.nombres_mostrar = {
+            categoria: PATRON_PREFIJO_CAPACIDAD.sub(
+                "", self.mapeo_nombres.get(categoria, categoria)
+            )
+            for categoria in self.todas_categorias
+        }
+
+        # 6. Columnas de agrupación como categóricas (groupby sobre códigos enteros)
+        for columna in [
+            "municipio_sede_prestador",
+            "nombre_prestador",
+            "nombre_sede_prestador",
+            "nombre_capacidad_instalada",
+        ]:
+            self.df[columna] = self.df[columna].astype("category")
+
+        # Nombre corto de cada IPS (máx. 50 caracteres), truncado sobre los valores únicos
+        ips = self.df["nombre_prestador"].cat.categories.to_series()
+        ips_cortos = ips.where(ips.str.len() <= 50, ips.str[:50] + "...")
+        self.nombres_ips_cortos = dict(zip(ips, ips_cortos))
+
+        # 7. Agregado base: una fila por municipio, IPS, sede y categoría. Todas las
+        #    tablas del informe se derivan de aquí en vez de recorrer cada registro.
+        self.df_agregado = (
+            self.df.groupby(
+                [
+                    "municipio_sede_prestador",
+                    "nombre_prestador",
+                    "nombre_sede_prestador",
+                    "nombre_capacidad_instalada",
+                ],
+                sort=False,
+                observed=True,
+                dropna=False,
+            )[["cantidad_ci_TOTAL_REPS", "ocupacion_actual"]]
+            .sum()
+            .reset_index()
+        )
+
         print(f"📊 Registros procesados: {len(self.df)}")
-        print(f"🏘️ Municipios: {self.df['municipio_sede_prestador'].nunique()}")
-        print(f"🏥 IPS: {self.df['nombre_prestador'].nunique()}")
+        print(f"🏘️ Municipios: {contar_unicos(self.df['municipio_sede_prestador'])}")
+        print(f"🏥 IPS: {contar_unicos(self.df['nombre_prestador'])}")
         print(f"📋 Categorías encontradas: {len(self.todas_categorias)}")
 
         # Mostrar configuración aplicada
@@ -328,6 +696,11 @@ class HospitalCompletoGenerator:
         print(f"   📝 Cambios de nombres: {len(self.mapeo_nombres)}")
         print(f"   📊 Subgrupos definidos: {len(self.subgrupos)}")
 
+        # Categorías que no pertenecen a ningún subgrupo (sobre los valores únicos)
+        sin_subgrupo = sorted(set(self.todas_categorias) - self.categoria_a_subgrupo.keys())
+        if sin_subgrupo:
+            print(f"   ⚠️ Categorías sin subgrupo: {sin_subgrupo}")
+
     def _extraer_fecha_registro(self):
         """Extraer fecha de registro del Excel."""
         try:
@@ -338,7 +711,6 @@ class HospitalCompletoGenerator:
 
                     if isinstance(fecha_registro, str):
                         try:
-                            from dateutil import parser
                             fecha_registro = parser.parse(fecha_registro)
                         except:
                             print("⚠️ No se pudo parsear fecha_registro, usando fecha actual")
@@ -376,77 +748,38 @@ class HospitalCompletoGenerator:
 
     def _crear_seccion_firmas(self):
         """Crear sección de firmas institucionales."""
-        estilos = getSampleStyleSheet()
-
-        estilo_firma = ParagraphStyle(
-            "EstiloFirma",
-            parent=estilos["Normal"],
-            fontSize=9,
-            spaceAfter=4,
-            spaceBefore=2,
-            alignment=TA_LEFT,
-            fontName="Helvetica",
-        )
-
-        estilo_firma_center = ParagraphStyle(
-            "EstiloFirmaCenter",
-            parent=estilos["Normal"],
-            fontSize=9,
-            spaceAfter=4,
-            spaceBefore=2,
-            alignment=TA_CENTER,
-            fontName="Helvetica",
-        )
-
         elementos_firmas = []
 
         elementos_firmas.append(Spacer(1, 0.4 * inch))
-        elementos_firmas.append(Paragraph("Cordialmente,", estilo_firma))
+        elementos_firmas.append(Paragraph("Cordialmente,", ESTILO_FIRMA))
         elementos_firmas.append(Spacer(1, 0.3 * inch))
 
         datos_firmas = [
             [
                 Paragraph(
                     "<b>DOUGLAS QUINTERO TÉLLEZ</b><br/>Director de Seguridad Social<br/>Secretaria de Salud del Tolima",
-                    estilo_firma_center,
+                    ESTILO_FIRMA_CENTER,
                 ),
                 Paragraph(
                     "<b>ALISON AMAYA REYES</b><br/>Directora Desarrollo de servicios<br/>Secretaria de Salud del Tolima",
-                    estilo_firma_center,
+                    ESTILO_FIRMA_CENTER,
                 ),
             ]
         ]
 
         tabla_firmas = Table(datos_firmas, colWidths=[3.5 * inch, 3.5 * inch])
-        tabla_firmas.setStyle(
-            TableStyle(
-                [
-                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                    ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
-                    ("FONTSIZE", (0, 0), (-1, -1), 9),
-                    ("TOPPADDING", (0, 0), (-1, -1), 20),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-                ]
-            )
-        )
+        tabla_firmas.setStyle(ESTILO_TABLA_FIRMAS)
 
         elementos_firmas.append(tabla_firmas)
         elementos_firmas.append(Spacer(1, 0.2 * inch))
 
+        # Créditos en un solo párrafo (una sola pasada del parser de ReportLab)
         elementos_firmas.append(
             Paragraph(
-                "<b>Proyecto:</b> Adriana Cardozo – Luis Alberto Ortiz Contratistas",
-                estilo_firma,
-            )
-        )
-        elementos_firmas.append(
-            Paragraph("<b>Automatización:</b> José Miguel Santos", estilo_firma)
-        )
-        elementos_firmas.append(
-            Paragraph(
+                "<b>Proyecto:</b> Adriana Cardozo – Luis Alberto Ortiz Contratistas<br/>"
+                "<b>Automatización:</b> José Miguel Santos<br/>"
                 "<b>Reviso:</b> Aldo Eugenio Beltrán Rivera – Coordinador de Emergencias y Desastres – CRUET",
-                estilo_firma,
+                ESTILO_FIRMA,
             )
         )
 
@@ -461,16 +794,70 @@ class HospitalCompletoGenerator:
         else:
             return "NORMAL"
 
+    def _agregar_por_claves(self, df, claves, conteos):
+        """Agregar capacidad, ocupación y conteos por las claves en un solo groupby."""
+        # Agregación con nombres: las columnas salen ya con su nombre final
+        # Los totales se expresan en enteros (trunca si la columna quedó en float64)
+        return df.groupby(claves, sort=False, observed=True).agg(
+            capacidad=("cantidad_ci_TOTAL_REPS", "sum"),
+            ocupacion=("ocupacion_actual", "sum"),
+            **{clave: (columna, "nunique") for clave, columna in conteos.items()},
+        ).astype({"capacidad": "int64", "ocupacion": "int64"})
+
+    def _datos_por_fila(self, resumen, conteos):
+        """Recorrer un resumen agregado como pares (índice, datos de la categoría)."""
+        # Porcentaje y estado de todas las filas en una sola pasada. Se redondea con
+        # round() de Python, igual que los totales (np.round difiere en algunos .x5)
+        porcentajes = [
+            round(porcentaje, 1)
+            for porcentaje in calcular_porcentaje_ocupacion(
+                resumen["ocupacion"], resumen["capacidad"]
+            ).tolist()
+        ]
+        estados = clasificar_estado(porcentajes)
+
+        filas = zip(
+            resumen.index,
+            resumen.itertuples(index=False, name=None),
+            porcentajes,
+            estados.tolist(),
+        )
+        for indice, (capacidad, ocupacion, *valores_conteo), porcentaje, estado in filas:
+            datos = {
+                'capacidad': capacidad,
+                'ocupacion': ocupacion,
+                'disponible': capacidad - ocupacion,
+                'porcentaje': porcentaje if capacidad > 0 else 0,
+                'estado': estado
+            }
+            datos.update(zip(conteos.keys(), valores_conteo))
+            yield indice, datos
+
+    def _resumir_por_categoria(self, df, conteos=None):
+        """Agregar capacidad, ocupación y conteos por categoría en un solo groupby."""
+        conteos = conteos or {}
+        resumen = self._agregar_por_claves(df, "nombre_capacidad_instalada", conteos)
+        return dict(self._datos_por_fila(resumen, conteos))
+
+    def _resumir_por_ips_y_categoria(self, df):
+        """Resumen por categoría de cada IPS con un solo groupby (IPS en orden de aparición)."""
+        resumen = self._agregar_por_claves(
+            df, ["nombre_prestador", "nombre_capacidad_instalada"], {}
+        )
+
+        datos_por_ips = {}
+        for (ips, categoria), datos in self._datos_por_fila(resumen, {}):
+            datos_por_ips.setdefault(ips, {})[categoria] = datos
+        return datos_por_ips
+
     def _organizar_datos_por_subgrupos(self, datos_categorias):
         """Organizar los datos por subgrupos y agregar totales."""
         datos_organizados = []
-        
-        # Crear un mapeo inverso de categorías a subgrupos
-        categoria_a_subgrupo = {}
-        for subgrupo, categorias in self.subgrupos.items():
-            for categoria in categorias:
-                categoria_a_subgrupo[categoria] = subgrupo
-        
+
+        # Referencias locales a los diccionarios invariantes usados dentro de los ciclos
+        nombres_mostrar = self.nombres_mostrar
+        titulos_total_subgrupo = self.titulos_total_subgrupo
+
         # Procesar por subgrupos
         for subgrupo, categorias_subgrupo in self.subgrupos.items():
             # Agregar categorías individuales del subgrupo
@@ -482,9 +869,8 @@ class HospitalCompletoGenerator:
                 if categoria in datos_categorias:
                     datos_cat = datos_categorias[categoria]
                     
-                    # Aplicar cambio de nombre si existe
-                    nombre_mostrar = self.mapeo_nombres.get(categoria, categoria)
-                    nombre_mostrar = nombre_mostrar.replace("CAMAS-", "").replace("CAMILLAS-", "")
+                    # Nombre con cambio aplicado (precalculado en _procesar_datos)
+                    nombre_mostrar = nombres_mostrar[categoria]
                     
                     # Agregar fila de categoría individual
                     datos_organizados.append({
@@ -513,7 +899,7 @@ class HospitalCompletoGenerator:
                 
                 datos_organizados.append({
                     'tipo': 'subgrupo',
-                    'nombre': f"📊 TOTAL {subgrupo}",
+                    'nombre': titulos_total_subgrupo[subgrupo],
                     'capacidad': subgrupo_capacidad,
                     'ocupacion': subgrupo_ocupacion,
                     'disponible': subgrupo_disponible,
@@ -524,85 +910,72 @@ class HospitalCompletoGenerator:
                     'estado': subgrupo_estado
                 })
         
-        # Agregar categorías que no pertenecen a ningún subgrupo
-        for categoria, datos_cat in datos_categorias.items():
-            if categoria not in categoria_a_subgrupo:
-                nombre_mostrar = categoria.replace("CAMAS-", "").replace("CAMILLAS-", "")
-                datos_organizados.append({
-                    'tipo': 'categoria',
-                    'nombre': nombre_mostrar,
-                    'capacidad': datos_cat['capacidad'],
-                    'ocupacion': datos_cat['ocupacion'],
-                    'disponible': datos_cat['disponible'],
-                    'porcentaje': datos_cat['porcentaje'],
-                    'municipios': datos_cat.get('municipios', ''),
-                    'ips': datos_cat.get('ips', ''),
-                    'sedes': datos_cat.get('sedes', ''),
-                    'estado': datos_cat['estado']
-                })
+        # Agregar categorías que no pertenecen a ningún subgrupo (orden alfabético)
+        for categoria in sorted(datos_categorias.keys() - self.categoria_a_subgrupo.keys()):
+            datos_cat = datos_categorias[categoria]
+            datos_organizados.append({
+                'tipo': 'categoria',
+                'nombre': nombres_mostrar[categoria],
+                'capacidad': datos_cat['capacidad'],
+                'ocupacion': datos_cat['ocupacion'],
+                'disponible': datos_cat['disponible'],
+                'porcentaje': datos_cat['porcentaje'],
+                'municipios': datos_cat.get('municipios', ''),
+                'ips': datos_cat.get('ips', ''),
+                'sedes': datos_cat.get('sedes', ''),
+                'estado': datos_cat['estado']
+            })
         
         return datos_organizados
 
     def _crear_tabla_resumen_departamental(self):
         """Tabla resumen departamental con subgrupos organizados."""
         # Recopilar datos por categoría
-        datos_categorias = {}
-        
-        for categoria in self.todas_categorias:
-            df_categoria = self.df[self.df["nombre_capacidad_instalada"] == categoria]
-
-            if len(df_categoria) > 0:
-                capacidad = int(df_categoria["cantidad_ci_TOTAL_REPS"].sum())
-                ocupacion = int(df_categoria["ocupacion_actual"].sum())
-                disponible = capacidad - ocupacion
-                porcentaje = round((ocupacion / capacidad * 100), 1) if capacidad > 0 else 0
-                municipios = df_categoria["municipio_sede_prestador"].nunique()
-                ips = df_categoria["nombre_prestador"].nunique()
-                estado = self._determinar_estado(porcentaje)
-
-                datos_categorias[categoria] = {
-                    'capacidad': capacidad,
-                    'ocupacion': ocupacion,
-                    'disponible': disponible,
-                    'porcentaje': porcentaje,
-                    'municipios': municipios,
-                    'ips': ips,
-                    'estado': estado
-                }
+        datos_categorias = self._resumir_por_categoria(
+            self.df_agregado,
+            {"municipios": "municipio_sede_prestador", "ips": "nombre_prestador"},
+        )
 
         # Organizar por subgrupos
         datos_organizados = self._organizar_datos_por_subgrupos(datos_categorias)
         
         # Convertir a formato de tabla
-        datos_tabla = []
-        for item in datos_organizados:
-            datos_tabla.append([
+        datos_tabla = [
+            [
                 item['nombre'],
-                f"{item['capacidad']:,}",
-                f"{item['ocupacion']:,}",
-                f"{item['disponible']:,}",
-                f"{item['porcentaje']}%",
+                *formatear_celdas(
+                    item['capacidad'], item['ocupacion'], item['disponible'], item['porcentaje']
+                ),
                 str(item['municipios']),
                 str(item['ips']),
                 item['estado'],
                 item['tipo']  # Para identificar el tipo de fila
-            ])
+            ]
+            for item in datos_organizados
+        ]
 
         # Totales generales
-        total_capacidad = int(self.df["cantidad_ci_TOTAL_REPS"].sum())
-        total_ocupacion = int(self.df["ocupacion_actual"].sum())
+        total_capacidad, total_ocupacion = sumar_capacidad_ocupacion(self.df_agregado)
         total_disponible = total_capacidad - total_ocupacion
         total_porcentaje = round((total_ocupacion / total_capacidad * 100), 1) if total_capacidad > 0 else 0
-        total_municipios = self.df["municipio_sede_prestador"].nunique()
-        total_ips = self.df["nombre_prestador"].nunique()
+        total_municipios = contar_unicos(self.df_agregado["municipio_sede_prestador"])
+        total_ips = contar_unicos(self.df_agregado["nombre_prestador"])
         estado_general = self._determinar_estado(total_porcentaje)
 
+        # Guardar totales para el resumen de consola (evita recalcularlos en main)
+        self.totales_departamento = {
+            "capacidad": total_capacidad,
+            "ocupacion": total_ocupacion,
+            "porcentaje": total_porcentaje,
+            "municipios": total_municipios,
+            "ips": total_ips,
+        }
+
         datos_tabla.append([
             "TOTAL DEPARTAMENTO",
-            f"{total_capacidad:,}",
-            f"{total_ocupacion:,}",
-            f"{total_disponible:,}",
-            f"{total_porcentaje}%",
+            *formatear_celdas(
+                total_capacidad, total_ocupacion, total_disponible, total_porcentaje
+            ),
             str(total_municipios),
             str(total_ips),
             estado_general,
@@ -623,89 +996,65 @@ class HospitalCompletoGenerator:
 
         return [headers] + datos_tabla
 
-    def _crear_tabla_ips_por_municipio(self, municipio):
+    def _crear_tabla_ips_por_municipio(self, municipio, df_municipio):
         """Crear tabla IPS por municipio con subgrupos organizados."""
-        df_municipio = self.df[self.df["municipio_sede_prestador"] == municipio]
-
         if df_municipio.empty:
             return None
 
         datos_tabla = []
-
-        # Agrupar por IPS
-        for ips in df_municipio["nombre_prestador"].unique():
-            df_ips = df_municipio[df_municipio["nombre_prestador"] == ips]
-
-            # Totales por IPS
-            total_cap_ips = int(df_ips["cantidad_ci_TOTAL_REPS"].sum())
-            total_ocup_ips = int(df_ips["ocupacion_actual"].sum())
+        nombres_ips_cortos = self.nombres_ips_cortos
+
+        # Categorías de todas las IPS del municipio en un solo groupby (en orden de aparición)
+        for ips, datos_categorias_ips in self._resumir_por_ips_y_categoria(
+            df_municipio
+        ).items():
+
+            # Totales por IPS (suma de sus categorías en una sola pasada)
+            total_cap_ips = total_ocup_ips = 0
+            for datos in datos_categorias_ips.values():
+                total_cap_ips += datos['capacidad']
+                total_ocup_ips += datos['ocupacion']
             total_disp_ips = total_cap_ips - total_ocup_ips
             total_porc_ips = round((total_ocup_ips / total_cap_ips * 100), 1) if total_cap_ips > 0 else 0
             estado_ips = self._determinar_estado(total_porc_ips)
 
             # Fila resumen IPS
-            nombre_ips_corto = ips[:50] + "..." if len(ips) > 50 else ips
             datos_tabla.append([
-                f"🏥 {nombre_ips_corto}",
-                f"{total_cap_ips:,}",
-                f"{total_ocup_ips:,}",
-                f"{total_disp_ips:,}",
-                f"{total_porc_ips}%",
+                nombres_ips_cortos[ips],
+                *formatear_celdas(
+                    total_cap_ips, total_ocup_ips, total_disp_ips, total_porc_ips
+                ),
                 estado_ips,
                 "ips"
             ])
 
-            # Recopilar categorías de esta IPS y organizarlas por subgrupos
-            datos_categorias_ips = {}
-            categorias_ips = df_ips["nombre_capacidad_instalada"].unique()
-            
-            for categoria in sorted(categorias_ips):
-                df_cat_ips = df_ips[df_ips["nombre_capacidad_instalada"] == categoria]
-
-                if len(df_cat_ips) > 0:
-                    cap = int(df_cat_ips["cantidad_ci_TOTAL_REPS"].sum())
-                    ocup = int(df_cat_ips["ocupacion_actual"].sum())
-                    disp = cap - ocup
-                    porc = round((ocup / cap * 100), 1) if cap > 0 else 0
-                    estado_cat = self._determinar_estado(porc)
-
-                    datos_categorias_ips[categoria] = {
-                        'capacidad': cap,
-                        'ocupacion': ocup,
-                        'disponible': disp,
-                        'porcentaje': porc,
-                        'estado': estado_cat
-                    }
-
             # Organizar por subgrupos para esta IPS
             datos_organizados_ips = self._organizar_datos_por_subgrupos(datos_categorias_ips)
             
             # Agregar filas organizadas por subgrupos
-            for item in datos_organizados_ips:
-                prefijo = "   📊 " if item['tipo'] == 'subgrupo' else "   └─ "
-                datos_tabla.append([
-                    f"{prefijo}{item['nombre']}",
-                    f"{item['capacidad']:,}",
-                    f"{item['ocupacion']:,}",
-                    f"{item['disponible']:,}",
-                    f"{item['porcentaje']}%",
+            datos_tabla.extend(
+                [
+                    PREFIJOS_FILA_IPS[item['tipo']] + item['nombre'],
+                    *formatear_celdas(
+                        item['capacidad'], item['ocupacion'], item['disponible'], item['porcentaje']
+                    ),
                     item['estado'],
                     item['tipo']
-                ])
+                ]
+                for item in datos_organizados_ips
+            )
 
         # Total del municipio
-        total_cap_mun = int(df_municipio["cantidad_ci_TOTAL_REPS"].sum())
-        total_ocup_mun = int(df_municipio["ocupacion_actual"].sum())
+        total_cap_mun, total_ocup_mun = sumar_capacidad_ocupacion(df_municipio)
         total_disp_mun = total_cap_mun - total_ocup_mun
         total_porc_mun = round((total_ocup_mun / total_cap_mun * 100), 1) if total_cap_mun > 0 else 0
         estado_mun = self._determinar_estado(total_porc_mun)
 
         datos_tabla.append([
-            f"📊 TOTAL {municipio.upper()}",
-            f"{total_cap_mun:,}",
-            f"{total_ocup_mun:,}",
-            f"{total_disp_mun:,}",
-            f"{total_porc_mun}%",
+            f"TOTAL {municipio.upper()}",
+            *formatear_celdas(
+                total_cap_mun, total_ocup_mun, total_disp_mun, total_porc_mun
+            ),
             estado_mun,
             "total"
         ])
@@ -724,70 +1073,50 @@ class HospitalCompletoGenerator:
 
     def _crear_tabla_federico_lleras_final(self):
         """Crear tabla Federico Lleras con subgrupos organizados."""
-        df_federico = self.df[
-            self.df["nombre_prestador"].str.contains(
-                "FEDERICO LLERAS ACOSTA", case=False, na=False
-            )
+        # Buscar el patrón solo en los nombres únicos de IPS (categorías) y filtrar por ellos
+        prestadores = self.df_agregado["nombre_prestador"].cat.categories
+        ips_federico = prestadores[prestadores.str.contains(PATRON_FEDERICO)]
+        df_federico = self.df_agregado[
+            self.df_agregado["nombre_prestador"].isin(ips_federico)
         ]
 
         if df_federico.empty:
             return None
 
         # Recopilar datos por categoría
-        datos_categorias = {}
-        categorias_federico = df_federico["nombre_capacidad_instalada"].unique()
-        
-        for categoria in sorted(categorias_federico):
-            df_cat = df_federico[df_federico["nombre_capacidad_instalada"] == categoria]
-
-            if len(df_cat) > 0:
-                capacidad = int(df_cat["cantidad_ci_TOTAL_REPS"].sum())
-                ocupacion = int(df_cat["ocupacion_actual"].sum())
-                disponible = capacidad - ocupacion
-                porcentaje = round((ocupacion / capacidad * 100), 1) if capacidad > 0 else 0
-                sedes = df_cat["nombre_sede_prestador"].nunique()
-                estado = self._determinar_estado(porcentaje)
-
-                datos_categorias[categoria] = {
-                    'capacidad': capacidad,
-                    'ocupacion': ocupacion,
-                    'disponible': disponible,
-                    'porcentaje': porcentaje,
-                    'sedes': sedes,
-                    'estado': estado
-                }
+        datos_categorias = self._resumir_por_categoria(
+            df_federico, {"sedes": "nombre_sede_prestador"}
+        )
 
         # Organizar por subgrupos
         datos_organizados = self._organizar_datos_por_subgrupos(datos_categorias)
         
         # Convertir a formato de tabla
-        datos_tabla = []
-        for item in datos_organizados:
-            datos_tabla.append([
+        datos_tabla = [
+            [
                 item['nombre'],
-                f"{item['capacidad']:,}",
-                f"{item['ocupacion']:,}",
-                f"{item['disponible']:,}",
-                f"{item['porcentaje']}%",
+                *formatear_celdas(
+                    item['capacidad'], item['ocupacion'], item['disponible'], item['porcentaje']
+                ),
                 str(item['sedes']),
                 item['estado'],
                 item['tipo']
-            ])
+            ]
+            for item in datos_organizados
+        ]
 
         # Total Federico Lleras
-        total_capacidad = int(df_federico["cantidad_ci_TOTAL_REPS"].sum())
-        total_ocupacion = int(df_federico["ocupacion_actual"].sum())
+        total_capacidad, total_ocupacion = sumar_capacidad_ocupacion(df_federico)
         total_disponible = total_capacidad - total_ocupacion
         total_porcentaje = round((total_ocupacion / total_capacidad * 100), 1) if total_capacidad > 0 else 0
-        total_sedes = df_federico["nombre_sede_prestador"].nunique()
+        total_sedes = contar_unicos(df_federico["nombre_sede_prestador"])
         estado_general = self._determinar_estado(total_porcentaje)
 
         datos_tabla.append([
             "TOTAL FEDERICO LLERAS",
-            f"{total_capacidad:,}",
-            f"{total_ocupacion:,}",
-            f"{total_disponible:,}",
-            f"{total_porcentaje}%",
+            *formatear_celdas(
+                total_capacidad, total_ocupacion, total_disponible, total_porcentaje
+            ),
             str(total_sedes),
             estado_general,
             "total"
@@ -808,254 +1137,114 @@ class HospitalCompletoGenerator:
 
     def _crear_estilo_tabla_con_colores_y_subgrupos(self):
         """Crear estilo de tabla con colores diferenciados para subgrupos."""
-        return TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor(COLORS["primary"])),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("FONTSIZE", (0, 0), (-1, 0), 8),
-                ("FONTSIZE", (0, 1), (-1, -1), 7),
-                ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
-                ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
-                ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                ("ALIGN", (0, 1), (0, -1), "LEFT"),  # Nombres alineados a la izquierda
-            ]
-        )
+        return crear_estilo_tabla(COLORES_RL["primary"])
 
     def _aplicar_colores_estado_y_subgrupos(self, tabla_style, tabla_data, col_estado_index):
         """Aplicar colores diferenciados para estados y subgrupos."""
         col_tipo_index = len(tabla_data[0]) - 1  # Última columna es tipo_fila
-        
+
         for i, fila in enumerate(tabla_data[1:], 1):  # Saltar encabezado
             if len(fila) > col_estado_index:
-                estado = fila[col_estado_index]
                 tipo_fila = fila[col_tipo_index] if len(fila) > col_tipo_index else 'categoria'
-                
-                # Colores para filas de subgrupos
-                if tipo_fila == 'subgrupo':
-                    tabla_style.add(
-                        "BACKGROUND",
-                        (0, i),
-                        (-2, i),  # Todas las columnas excepto la última (tipo_fila)
-                        colors.HexColor(COLORS["subgrupo_bg"])
-                    )
-                    tabla_style.add(
-                        "FONTNAME",
-                        (0, i),
-                        (-2, i),
-                        "Helvetica-Bold"
-                    )
-                
-                # Colores para filas de totales
-                elif tipo_fila == 'total':
-                    tabla_style.add(
-                        "BACKGROUND",
-                        (0, i),
-                        (-2, i),
-                        colors.HexColor("#E3F2FD")
-                    )
-                    tabla_style.add(
-                        "FONTNAME",
-                        (0, i),
-                        (-2, i),
-                        "Helvetica-Bold"
-                    )
-                
-                # Colores por estado (en la columna de estado)
-                if "CRÍTICO" in estado:
-                    tabla_style.add(
-                        "BACKGROUND",
-                        (col_estado_index, i),
-                        (col_estado_index, i),
-                        colors.HexColor("#FFCDD2"),
-                    )
-                    tabla_style.add(
-                        "TEXTCOLOR",
-                        (col_estado_index, i),
-                        (col_estado_index, i),
-                        colors.HexColor("#B71C1C"),
-                    )
-                elif "ADVERTENCIA" in estado:
-                    tabla_style.add(
-                        "BACKGROUND",
-                        (col_estado_index, i),
-                        (col_estado_index, i),
-                        colors.HexColor("#FFF3E0"),
-                    )
-                    tabla_style.add(
-                        "TEXTCOLOR",
-                        (col_estado_index, i),
-                        (col_estado_index, i),
-                        colors.HexColor("#E65100"),
-                    )
-                else:  # NORMAL
-                    tabla_style.add(
-                        "BACKGROUND",
-                        (col_estado_index, i),
-                        (col_estado_index, i),
-                        colors.HexColor("#E8F5E8"),
-                    )
-                    tabla_style.add(
-                        "TEXTCOLOR",
-                        (col_estado_index, i),
-                        (col_estado_index, i),
-                        colors.HexColor("#2E7D32"),
-                    )
-
-    def generar_informe_completo(self, archivo_salida=None):
-        """Generar informe completo con subgrupos organizados."""
-        if archivo_salida is None:
-            timestamp = self.fecha_procesamiento.strftime("%Y%m%d_%H%M%S")
-            archivo_salida = f"informe_hospitalario_completo_{timestamp}.pdf"
-
-        print(f"📄 Generando informe hospitalario completo con subgrupos: {archivo_salida}")
-
-        # Extraer fecha de registro del Excel
-        fecha_registro = self._extraer_fecha_registro()
-
-        # Márgenes ajustados
-        header_height_inches = 95 / 72.0
-
-        doc = HospitalDocTemplate(
-            archivo_salida,
-            fecha_registro=fecha_registro,
-            pagesize=A4,
-            rightMargin=0.4 * inch,
-            leftMargin=0.4 * inch,
-            topMargin=(header_height_inches + 0.25) * inch,
-            bottomMargin=0.4 * inch,
-        )
-
-        elementos = []
-
-        # Estilos
-        estilos = getSampleStyleSheet()
-
-        titulo_principal = ParagraphStyle(
-            "TituloPrincipal",
-            parent=estilos["Title"],
-            fontSize=16,
-            spaceAfter=20,
-            textColor=colors.HexColor(COLORS["primary"]),
-            alignment=TA_CENTER,
-            fontName="Helvetica-Bold",
-        )
-
-        titulo_seccion = ParagraphStyle(
-            "TituloSeccion",
-            parent=estilos["Heading1"],
-            fontSize=12,
-            spaceAfter=12,
-            spaceBefore=6,
-            textColor=colors.HexColor(COLORS["primary"]),
-            fontName="Helvetica-Bold",
-        )
-
-        texto_normal = ParagraphStyle(
-            "TextoNormal",
-            parent=estilos["Normal"],
-            fontSize=9,
-            spaceAfter=8,
-            spaceBefore=4,
-            alignment=TA_JUSTIFY,
-        )
 
-        texto_small = ParagraphStyle(
-            "TextoSmall",
-            parent=estilos["Normal"],
-            fontSize=8,
-            spaceAfter=6,
-            spaceBefore=3,
-            alignment=TA_JUSTIFY,
-        )
+                # Filas de subgrupos y totales: fondo y negrilla en todas las columnas
+                # excepto la última (tipo_fila)
+                fondo_fila = FONDOS_TIPO_FILA.get(tipo_fila)
+                if fondo_fila is not None:
+                    tabla_style.add("BACKGROUND", (0, i), (-2, i), fondo_fila)
+                    tabla_style.add("FONTNAME", (0, i), (-2, i), "Helvetica-Bold")
 
-        # ======================================================================
-        # PORTADA OPTIMIZADA
-        # ======================================================================
-        elementos.append(Spacer(1, 0.3 * inch))
-        elementos.append(
-            Paragraph("INFORME DE CAPACIDAD HOSPITALARIA", titulo_principal)
-        )
+                # Colores por estado (en la columna de estado); NORMAL por defecto
+                fondo, texto = COLORES_ESTADO.get(
+                    fila[col_estado_index], COLORES_ESTADO["NORMAL"]
+                )
+                celda = (col_estado_index, i)
+                tabla_style.add("BACKGROUND", celda, celda, fondo)
+                tabla_style.add("TEXTCOLOR", celda, celda, texto)
 
-        # EXPLICACIÓN DE UMBRALES
-        elementos.append(Spacer(1, 0.2 * inch))
-        elementos.append(Paragraph("UMBRALES DE ESTADO DE OCUPACIÓN", titulo_seccion))
+    def _crear_tabla_pdf(self, tabla_data, col_estado_index, tabla_style=None, col_widths=None):
+        """Crear la tabla PDF con colores y sin la columna tipo_fila (LongTable si hay anchos fijos)."""
+        if tabla_style is None:
+            tabla_style = self._crear_estilo_tabla_con_colores_y_subgrupos()
+        self._aplicar_colores_estado_y_subgrupos(tabla_style, tabla_data, col_estado_index)
 
-        explicacion_umbrales = f"""
-        • <b>🟢 NORMAL:</b> Menos del {UMBRALES['advertencia']}% de ocupación<br/>
-        • <b>🟡 ADVERTENCIA:</b> Entre {UMBRALES['advertencia']}% y {UMBRALES['critico']-1}% de ocupación<br/>
-        • <b>🔴 CRÍTICO:</b> {UMBRALES['critico']}% o más de ocupación<br/>
-        """
+        # Remover la columna tipo_fila (última columna) para mostrar
+        tabla_display = [fila[:-1] for fila in tabla_data]
 
-        elementos.append(Paragraph(explicacion_umbrales, texto_normal))
+        if col_widths is None:
+            tabla_pdf = Table(tabla_display, repeatRows=1)
+        else:
+            tabla_pdf = LongTable(tabla_display, colWidths=col_widths, repeatRows=1)
+        tabla_pdf.setStyle(tabla_style)
+        return tabla_pdf
+
+    # ======================================================================
+    # SECCIONES DEL INFORME
+    # ======================================================================
+    def _crear_seccion_portada(self):
+        """Portada con título y explicación de umbrales."""
+        return [
+            Spacer(1, 0.3 * inch),
+            Paragraph("INFORME DE CAPACIDAD HOSPITALARIA", ESTILO_TITULO_PRINCIPAL),
+            # EXPLICACIÓN DE UMBRALES
+            Spacer(1, 0.2 * inch),
+            Paragraph("UMBRALES DE ESTADO DE OCUPACIÓN", ESTILO_TITULO_SECCION),
+            Paragraph(TEXTO_UMBRALES, ESTILO_TEXTO_NORMAL),
+        ]
 
-        # ======================================================================
-        # RESUMEN DEPARTAMENTAL CON SUBGRUPOS
-        # ======================================================================
-        elementos.append(Spacer(1, 0.3 * inch))
-        elementos.append(
-            Paragraph("1. RESUMEN DEPARTAMENTO DEL TOLIMA", titulo_seccion)
-        )
+    def _crear_seccion_departamental(self):
+        """Resumen departamental con subgrupos."""
+        elementos = [
+            Spacer(1, 0.3 * inch),
+            Paragraph("1. RESUMEN DEPARTAMENTO DEL TOLIMA", ESTILO_TITULO_SECCION),
+        ]
 
         tabla_departamental = self._crear_tabla_resumen_departamental()
         if tabla_departamental:
-            tabla_style = self._crear_estilo_tabla_con_colores_y_subgrupos()
-            self._aplicar_colores_estado_y_subgrupos(tabla_style, tabla_departamental, 7)
-
-            # Remover la columna tipo_fila (última columna) para mostrar
-            tabla_display = []
-            for fila in tabla_departamental:
-                tabla_display.append(fila[:-1])  # Excluir última columna
-
-            tabla_pdf = Table(tabla_display, repeatRows=1)
-            tabla_pdf.setStyle(tabla_style)
+            tabla_pdf = self._crear_tabla_pdf(tabla_departamental, 7)
             elementos.append(KeepTogether([tabla_pdf]))
 
-        # ======================================================================
-        # IBAGUÉ CON SUBGRUPOS
-        # ======================================================================
-        elementos.append(Spacer(1, 0.3 * inch))
-        
-        tabla_ibague = self._crear_tabla_ips_por_municipio("Ibagué")
-        if tabla_ibague:
-            titulo_ibague = Paragraph("2. IBAGUÉ", titulo_seccion)
-            
-            tabla_style = self._crear_estilo_tabla_con_colores_y_subgrupos()
-            self._aplicar_colores_estado_y_subgrupos(tabla_style, tabla_ibague, 5)
+        return elementos
 
-            # Remover columna tipo_fila
-            tabla_display = []
-            for fila in tabla_ibague:
-                tabla_display.append(fila[:-1])
+    def _crear_seccion_ibague(self, df_ibague):
+        """Sección de Ibagué con subgrupos (termina con salto de página)."""
+        elementos = [Spacer(1, 0.3 * inch)]
 
-            tabla_pdf = Table(tabla_display, repeatRows=1)
-            tabla_pdf.setStyle(tabla_style)
-            
+        # Sin datos de Ibagué no se construye tabla ni estilo
+        tabla_ibague = (
+            self._crear_tabla_ips_por_municipio("Ibagué", df_ibague)
+            if df_ibague is not None
+            else None
+        )
+        if tabla_ibague:
+            tabla_pdf = self._crear_tabla_pdf(
+                tabla_ibague, 5, col_widths=ANCHOS_TABLA_IPS
+            )
             elementos.append(KeepTogether([
-                titulo_ibague,
+                Paragraph("2. IBAGUÉ", ESTILO_TITULO_SECCION),
                 Spacer(1, 0.05 * inch),
                 tabla_pdf
             ]))
         else:
-            elementos.append(Paragraph("2. IBAGUÉ", titulo_seccion))
-            elementos.append(
-                Paragraph("⚠️ No se encontraron datos para Ibagué", texto_normal)
-            )
+            elementos.extend([
+                Paragraph("2. IBAGUÉ", ESTILO_TITULO_SECCION),
+                Paragraph("No se encontraron datos para Ibagué", ESTILO_TEXTO_NORMAL),
+            ])
 
         elementos.append(PageBreak())
+        return elementos
 
-        # ======================================================================
-        # OTROS MUNICIPIOS CON SUBGRUPOS
-        # ======================================================================
-        elementos.append(Spacer(1, 0.1 * inch))
-        elementos.append(Paragraph("3. OTROS MUNICIPIOS DEL TOLIMA", titulo_seccion))
+    def _crear_seccion_otros_municipios(self, datos_por_municipio):
+        """Sección de los demás municipios con subgrupos (termina con salto de página)."""
+        elementos = [
+            Spacer(1, 0.1 * inch),
+            Paragraph("3. OTROS MUNICIPIOS DEL TOLIMA", ESTILO_TITULO_SECCION),
+        ]
 
+        # Los grupos salen en el orden (ya ordenado) de las categorías del municipio
         otros_municipios = [
-            m for m in self.df["municipio_sede_prestador"].unique() if m != "Ibagué"
+            municipio for municipio in datos_por_municipio if municipio != "Ibagué"
         ]
-        otros_municipios.sort()
 
         print(f"📋 Procesando {len(otros_municipios)} municipios con subgrupos...")
 
@@ -1064,31 +1253,24 @@ class HospitalCompletoGenerator:
         espacio_disponible_por_pagina = 550
 
         for i, municipio in enumerate(otros_municipios):
-            tabla_municipio = self._crear_tabla_ips_por_municipio(municipio)
-            
+            tabla_municipio = self._crear_tabla_ips_por_municipio(
+                municipio, datos_por_municipio[municipio]
+            )
+            titulo_municipio = Paragraph(f"3.{i+1}. {municipio.upper()}", ESTILO_TITULO_SECCION)
+
             if tabla_municipio:
-                titulo_municipio = Paragraph(f"3.{i+1}. {municipio.upper()}", titulo_seccion)
-                
                 altura_estimada = self._estimar_altura_tabla(tabla_municipio)
                 altura_con_titulo = altura_estimada + 40
 
                 if espacio_usado_actual + altura_con_titulo > espacio_disponible_por_pagina and municipios_en_pagina_actual > 0:
-                    elementos.append(PageBreak())
-                    elementos.append(Spacer(1, 0.1 * inch))
+                    elementos.extend([PageBreak(), Spacer(1, 0.1 * inch)])
                     municipios_en_pagina_actual = 0
                     espacio_usado_actual = 0
 
-                tabla_style = self._crear_estilo_tabla_con_colores_y_subgrupos()
-                self._aplicar_colores_estado_y_subgrupos(tabla_style, tabla_municipio, 5)
-
-                # Remover columna tipo_fila
-                tabla_display = []
-                for fila in tabla_municipio:
-                    tabla_display.append(fila[:-1])
+                tabla_pdf = self._crear_tabla_pdf(
+                    tabla_municipio, 5, col_widths=ANCHOS_TABLA_IPS
+                )
 
-                tabla_pdf = Table(tabla_display, repeatRows=1)
-                tabla_pdf.setStyle(tabla_style)
-                
                 elementos.append(KeepTogether([
                     titulo_municipio,
                     Spacer(1, 0.05 * inch),
@@ -1100,76 +1282,92 @@ class HospitalCompletoGenerator:
                 espacio_usado_actual += altura_con_titulo + 5
 
             else:
-                titulo_municipio = Paragraph(f"3.{i+1}. {municipio.upper()}", titulo_seccion)
                 mensaje_sin_datos = Paragraph(
-                    f"⚠️ No se encontraron datos para {municipio}", texto_small
+                    f"No se encontraron datos para {municipio}", ESTILO_TEXTO_SMALL
                 )
-                
+
                 elementos.append(KeepTogether([
                     titulo_municipio,
                     Spacer(1, 0.02 * inch),
                     mensaje_sin_datos,
                     Spacer(1, 0.05 * inch)
                 ]))
-                
+
                 municipios_en_pagina_actual += 1
                 espacio_usado_actual += 35
 
         elementos.append(PageBreak())
+        return elementos
+
+    def _crear_seccion_federico(self):
+        """Sección del Hospital Federico Lleras Acosta con subgrupos."""
+        elementos = [Spacer(1, 0.1 * inch)]
 
-        # ======================================================================
-        # HOSPITAL FEDERICO LLERAS CON SUBGRUPOS
-        # ======================================================================
-        elementos.append(Spacer(1, 0.1 * inch))
-        
         tabla_federico = self._crear_tabla_federico_lleras_final()
         if tabla_federico:
-            titulo_federico = Paragraph("4. HOSPITAL FEDERICO LLERAS ACOSTA", titulo_seccion)
-            
-            tabla_style = TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor(COLORS["danger"])),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("FONTSIZE", (0, 0), (-1, 0), 10),
-                    ("FONTSIZE", (0, 1), (-1, -1), 9),
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                    ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
-                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                    ("ALIGN", (0, 1), (0, -1), "LEFT"),
-                ]
+            tabla_pdf = self._crear_tabla_pdf(
+                tabla_federico,
+                6,
+                tabla_style=crear_estilo_tabla(
+                    COLORES_RL["danger"], fuente_encabezado=10, fuente_cuerpo=9, padding_encabezado=12
+                ),
             )
-
-            self._aplicar_colores_estado_y_subgrupos(tabla_style, tabla_federico, 6)
-
-            # Remover columna tipo_fila
-            tabla_display = []
-            for fila in tabla_federico:
-                tabla_display.append(fila[:-1])
-
-            tabla_pdf = Table(tabla_display, repeatRows=1)
-            tabla_pdf.setStyle(tabla_style)
-            
             elementos.append(KeepTogether([
-                titulo_federico,
+                Paragraph("4. HOSPITAL FEDERICO LLERAS ACOSTA", ESTILO_TITULO_SECCION),
                 Spacer(1, 0.1 * inch),
                 tabla_pdf
             ]))
         else:
-            elementos.append(Paragraph("4. HOSPITAL FEDERICO LLERAS ACOSTA", titulo_seccion))
-            elementos.append(
+            elementos.extend([
+                Paragraph("4. HOSPITAL FEDERICO LLERAS ACOSTA", ESTILO_TITULO_SECCION),
                 Paragraph(
-                    "⚠️ <b>Hospital Federico Lleras Acosta no encontrado</b>",
-                    texto_normal,
-                )
-            )
+                    "<b>Hospital Federico Lleras Acosta no encontrado</b>",
+                    ESTILO_TEXTO_NORMAL,
+                ),
+            ])
+
+        return elementos
+
+    def generar_informe_completo(self, archivo_salida=None):
+        """Generar informe completo con subgrupos organizados."""
+        if archivo_salida is None:
+            archivo_salida = f"informe_hospitalario_completo_{self.timestamp_archivo}.pdf"
+
+        print(f"📄 Generando informe hospitalario completo con subgrupos: {archivo_salida}")
+
+        # Extraer fecha de registro del Excel
+        fecha_registro = self._extraer_fecha_registro()
 
-        # ======================================================================
-        # SECCIÓN DE FIRMAS
-        # ======================================================================
-        elementos.extend(self._crear_seccion_firmas())
+        # Márgenes ajustados
+        header_height_inches = 95 / 72.0
+
+        doc = HospitalDocTemplate(
+            archivo_salida,
+            fecha_registro=fecha_registro,
+            pagesize=A4,
+            rightMargin=0.4 * inch,
+            leftMargin=0.4 * inch,
+            topMargin=(header_height_inches + 0.25) * inch,
+            bottomMargin=0.4 * inch,
+        )
+
+        # Dividir los datos por municipio en una sola pasada (Ibagué y otros municipios)
+        datos_por_municipio = {
+            municipio: df_municipio
+            for municipio, df_municipio in self.df_agregado.groupby(
+                "municipio_sede_prestador", observed=True
+            )
+        }
+
+        # Cada sección devuelve su lista de flowables
+        elementos = [
+            *self._crear_seccion_portada(),
+            *self._crear_seccion_departamental(),
+            *self._crear_seccion_ibague(datos_por_municipio.get("Ibagué")),
+            *self._crear_seccion_otros_municipios(datos_por_municipio),
+            *self._crear_seccion_federico(),
+            *self._crear_seccion_firmas(),
+        ]
 
         # Construir documento
         try:
@@ -1185,37 +1383,54 @@ class HospitalCompletoGenerator:
             return archivo_salida
         except Exception as e:
             print(f"❌ Error generando PDF: {str(e)}")
-            import traceback
             traceback.print_exc()
             return None
 
 
-def main():
+def main(argv=None):
     """Función principal."""
-    print("🏥" + "=" * 70)
-    print("=" * 72)
-    print("   Desarrollado por: Ing. José Miguel Santos")
-    print("   Para: Secretaría de Salud del Tolima")
-    print("   VERSIÓN FINAL: Subgrupos Organizados + Totales Estéticos")
-    print("=" * 72)
-
-    if len(sys.argv) < 2:
-        print("📋 USO DEL PROGRAMA:")
-        print("   python hospital_report.py <archivo_excel>")
-        print("")
-        print("📊 EJEMPLO:")
-        print("   python hospital_report.py Detalle_Ocupacion_CI.xlsx")
-        print("")
-        print("🎯 CARACTERÍSTICAS FINALES:")
-        print("   ✅ Ocupación real: ocupacion_ci_no_covid19")
-        print("   ✅ Hospitalización Adultos/Pediátrica")
-        print("   ✅ Errores de digitación corregidos")
-        print("   ✅ Subgrupos: UCI Intensivo, UCI Intermedio, Hospitalización, Urgencias")
-        print("   ✅ Totales estéticos por subgrupo")
-        print("   ✅ Aplicado en todas las secciones")
+    analizador = argparse.ArgumentParser(
+        description="Informe de capacidad hospitalaria del Tolima con subgrupos"
+    )
+    analizador.add_argument("archivo_excel", nargs="?", help="Archivo Excel de ocupación")
+    analizador.add_argument(
+        "-v", "--verbose", action="store_true", help="Mostrar el resumen de características"
+    )
+    # Como con sys.argv, los argumentos adicionales se ignoran en lugar de abortar
+    args, argumentos_ignorados = analizador.parse_known_args(argv)
+
+    # Cada bloque de texto se escribe con un solo print
+    print("\n".join([
+        "🏥" + "=" * 70,
+        "=" * 72,
+        "   Desarrollado por: Ing. José Miguel Santos",
+        "   Para: Secretaría de Salud del Tolima",
+        "   VERSIÓN FINAL: Subgrupos Organizados + Totales Estéticos",
+        "=" * 72,
+    ]))
+
+    if argumentos_ignorados:
+        print(f"⚠️ Argumentos ignorados: {' '.join(argumentos_ignorados)}")
+
+    if args.archivo_excel is None:
+        print("\n".join([
+            "📋 USO DEL PROGRAMA:",
+            "   python hospital_report.py <archivo_excel> [--verbose]",
+            "",
+            "📊 EJEMPLO:",
+            "   python hospital_report.py Detalle_Ocupacion_CI.xlsx",
+            "",
+            "🎯 CARACTERÍSTICAS FINALES:",
+            "   ✅ Ocupación real: ocupacion_ci_no_covid19",
+            "   ✅ Hospitalización Adultos/Pediátrica",
+            "   ✅ Errores de digitación corregidos",
+            "   ✅ Subgrupos: UCI Intensivo, UCI Intermedio, Hospitalización, Urgencias",
+            "   ✅ Totales estéticos por subgrupo",
+            "   ✅ Aplicado en todas las secciones",
+        ]))
         return
 
-    archivo_excel = sys.argv[1]
+    archivo_excel = args.archivo_excel
 
     if not os.path.exists(archivo_excel):
         print(f"❌ Error: El archivo '{archivo_excel}' no existe.")
@@ -1231,43 +1446,42 @@ def main():
         archivo_generado = generador.generar_informe_completo()
 
         if archivo_generado:
-            print("🎉" + "=" * 70)
-            print("✅ INFORME HOSPITALARIO FINAL GENERADO EXITOSAMENTE")
-            print(f"📄 Archivo: {archivo_generado}")
-            print(f"📊 Registros procesados: {len(generador.df):,}")
-
-            # Estadísticas finales
-            total_capacidad = generador.df["cantidad_ci_TOTAL_REPS"].sum()
-            total_ocupacion = generador.df["ocupacion_actual"].sum()
-            porcentaje_general = (
-                round((total_ocupacion / total_capacidad * 100), 1)
-                if total_capacidad > 0
-                else 0
-            )
+            # Estadísticas finales (calculadas al armar el resumen departamental)
+            totales = generador.totales_departamento
+
+            lineas = [
+                "🎉" + "=" * 70,
+                "✅ INFORME HOSPITALARIO FINAL GENERADO EXITOSAMENTE",
+                f"📄 Archivo: {archivo_generado}",
+                f"📊 Registros procesados: {len(generador.df):,}",
+                f"   🏘️ Municipios incluidos: {totales['municipios']}",
+                f"   🏥 IPS analizadas: {totales['ips']}",
+                f"   📋 Categorías procesadas: {len(generador.todas_categorias)}",
+                f"   🎯 Capacidad total: {totales['capacidad']:,} unidades",
+                f"   📈 Ocupación REAL: {totales['ocupacion']:,} pacientes ({totales['porcentaje']}%)",
+                "=" * 72,
+            ]
+
+            if args.verbose:
+                lineas.extend([
+                    "🎯 VERSIÓN FINAL COMPLETA:",
+                    "   ✅ Ocupación corregida con datos reales",
+                    "   ✅ Cambios de nombres aplicados",
+                    "   ✅ Errores de digitación unificados",
+                    "   ✅ Subgrupos organizados estéticamente",
+                    "   ✅ Totales por subgrupo en todas las secciones",
+                    "   ✅ Títulos y tablas siempre juntos",
+                    "   ✅ Optimización de espacios",
+                    "   ✅ Sistema completamente funcional",
+                    "=" * 72,
+                ])
 
-            print(f"   🏘️ Municipios incluidos: {generador.df['municipio_sede_prestador'].nunique()}")
-            print(f"   🏥 IPS analizadas: {generador.df['nombre_prestador'].nunique()}")
-            print(f"   📋 Categorías procesadas: {len(generador.todas_categorias)}")
-            print(f"   🎯 Capacidad total: {total_capacidad:,} unidades")
-            print(f"   📈 Ocupación REAL: {total_ocupacion:,} pacientes ({porcentaje_general}%)")
-
-            print("=" * 72)
-            print("🎯 VERSIÓN FINAL COMPLETA:")
-            print("   ✅ Ocupación corregida con datos reales")
-            print("   ✅ Cambios de nombres aplicados")
-            print("   ✅ Errores de digitación unificados")
-            print("   ✅ Subgrupos organizados estéticamente")
-            print("   ✅ Totales por subgrupo en todas las secciones")
-            print("   ✅ Títulos y tablas siempre juntos")
-            print("   ✅ Optimización de espacios")
-            print("   ✅ Sistema completamente funcional")
-            print("=" * 72)
+            print("\n".join(lineas))
         else:
             print("❌ Error al generar el informe.")
 
     except Exception as e:
         print(f"❌ Error inesperado: {str(e)}")
-        import traceback
         traceback.print_exc()
 
 